@@ -4,15 +4,54 @@ Real-time seating assignment with WebSocket support
 V 2.0
 """
 
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+# Only the dev server patches here; under gunicorn the gevent worker and the
+# post_fork hook patch before it loads the app, and CLIs/flask shell importing
+# app stay unpatched. psycopg2 is C code patch_all() can't reach, so it gets
+# psycogreen's wait callback - otherwise every query blocks the gevent hub.
+if __name__ == '__main__':
+    from gevent import monkey
+    monkey.patch_all()
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
+
+from flask import Flask, Response, render_template, request, jsonify, session, redirect, url_for
 from flask_socketio import SocketIO, emit
 from flask_cors import CORS
+from flask.json.provider import DefaultJSONProvider
 from models import db, TableAssignment, BlockedTable
+from sqlalchemy import bindparam, delete, event, exists, func, insert, select, text
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta
+from collections import defaultdict
+import hmac
 import os
+import threading
+import time
+import orjson
 from functools import wraps
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson for jsonify responses"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+class OrjsonSocketIO:
+    """json module stand-in for SocketIO packet encoding"""
+    
+    @staticmethod
+    def dumps(obj, **kwargs):
+        return orjson.dumps(obj).decode()
+    
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-change-this')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///seating.db')
 
@@ -21,6 +60,20 @@ if app.config['SQLALCHEMY_DATABASE_URI'].startswith('postgres://'):
     app.config['SQLALCHEMY_DATABASE_URI'] = app.config['SQLALCHEMY_DATABASE_URI'].replace('postgres://', 'postgresql://', 1)
 
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Connection pool for concurrent request/SocketIO greenlets. Only meaningful with
+# the psycogreen patch (gunicorn post_fork / __main__) - a blocking psycopg2 would
+# hold the hub and never use more than one connection at a time. Keep
+# pool_size + max_overflow per worker below the server's max_connections.
+# SQLite keeps SQLAlchemy's defaults.
+if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 25)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 25)),
+        'pool_pre_ping': True,
+        'pool_recycle': 300
+    }
+
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 app.config['SESSION_COOKIE_SECURE'] = False
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=2)
@@ -28,7 +81,7 @@ app.config['ADMIN_PASSWORD'] = os.environ.get('ADMIN_PASSWORD', 'admin123')
 
 # Initialize extensions
 db.init_app(app)
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode='gevent', json=OrjsonSocketIO)
 CORS(app)
 
 # Configuration
@@ -36,9 +89,58 @@ TOTAL_TABLES = 25
 SEATS_PER_TABLE = 10
 MAX_GUESTS = 250
 
+# Empty-table template built once; status builds copy it and overlay live data
+TABLE_SKELETON = tuple({
+    'number': table_num,
+    'capacity': SEATS_PER_TABLE,
+    'occupied': 0,
+    'available': SEATS_PER_TABLE,
+    'is_full': False,
+    'is_blocked': False,
+    'block_reason': '',
+    'occupants': []
+} for table_num in range(1, TOTAL_TABLES + 1))
+
+def _sqlite_pragmas(dbapi_conn, connection_record):
+    """WAL lets broadcast reads proceed while an assignment is being written"""
+    cursor = dbapi_conn.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA cache_size=-65536')
+    cursor.execute('PRAGMA mmap_size=268435456')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.close()
+
 # Create tables
 with app.app_context():
+    if db.engine.dialect.name == 'sqlite':
+        event.listen(db.engine, 'connect', _sqlite_pragmas)
     db.create_all()
+    # create_all skips existing tables, so add indexes introduced since first deploy
+    for index in TableAssignment.__table__.indexes:
+        index.create(db.engine, checkfirst=True)
+
+# Cached (tables, encoded body, encoded summary, version), rebuilt lazily after any write invalidates it
+_table_status_cache = None
+# Bumped on every invalidation so reconnecting clients can skip an unchanged snapshot.
+# Seeded from the clock so versions (and ETags) from before a restart are never reused.
+_state_version = time.time_ns() // 1_000_000
+# Cached (assignment dicts, dicts by ticket number, encoded listing) for listings and lookups, same lifetime
+_assignment_cache = None
+# Cached total assignment count for the pre-seating capacity check, same lifetime
+_guest_count = None
+_cache_lock = threading.Lock()
+
+# Debounced broadcast - writes within the window share a single table_update
+_broadcast_pending = False
+_broadcast_all = False
+_broadcast_tables = set()
+_broadcast_lock = threading.Lock()
+BROADCAST_DEBOUNCE_SECONDS = 0.05
+
+# Serializes capacity check-then-insert; PostgreSQL key extends it across workers
+_seating_lock = threading.Lock()
+SEATING_LOCK_KEY = 7426
 
 # ==================== DECORATORS ====================
 
@@ -50,52 +152,314 @@ def require_admin(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def serialize_seating(f):
+    """Run a seat-writing route under the seating lock so two requests
+    cannot both pass the capacity check and over-fill a table"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        with _seating_lock:
+            if db.engine.dialect.name == 'postgresql':
+                # Transaction-scoped, released on commit/rollback
+                db.session.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': SEATING_LOCK_KEY})
+            return f(*args, **kwargs)
+    return decorated_function
+
+# ==================== STATEMENTS ====================
+
+# Hot statements are built once at import; values are bound per execute
+
+# Columns needed to serialize an assignment - selected directly, no ORM hydration
+ASSIGNMENT_COLUMNS = (
+    TableAssignment.id,
+    TableAssignment.ticket_number,
+    TableAssignment.full_name,
+    TableAssignment.table_number,
+    TableAssignment.assigned_at
+)
+
+BLOCKED_REASONS = select(BlockedTable.table_number, BlockedTable.reason)
+
+OCCUPANTS = select(
+    TableAssignment.table_number,
+    TableAssignment.ticket_number,
+    TableAssignment.full_name
+).order_by(TableAssignment.table_number, TableAssignment.assigned_at)
+
+ALL_ASSIGNMENTS = select(*ASSIGNMENT_COLUMNS).order_by(
+    TableAssignment.table_number,
+    TableAssignment.assigned_at
+)
+
+ASSIGNMENTS_BY_TICKETS = select(*ASSIGNMENT_COLUMNS).where(
+    TableAssignment.ticket_number.in_(bindparam('ticket_numbers', expanding=True))
+)
+
+ASSIGNED_TABLES_BY_TICKETS = select(
+    TableAssignment.ticket_number,
+    TableAssignment.table_number
+).where(TableAssignment.ticket_number.in_(bindparam('ticket_numbers', expanding=True)))
+
+ASSIGNED_TICKETS_BY_TICKETS = select(TableAssignment.ticket_number).where(
+    TableAssignment.ticket_number.in_(bindparam('ticket_numbers', expanding=True))
+)
+
+# Existence guards fetch a single column (or an EXISTS flag), never a full row
+ASSIGNED_TABLE_BY_TICKET = select(TableAssignment.table_number).where(
+    TableAssignment.ticket_number == bindparam('ticket_number')
+)
+
+TABLE_IS_BLOCKED = select(exists().where(
+    BlockedTable.table_number == bindparam('table_number')
+))
+
+BLOCKED_IN_TABLES = select(BlockedTable.table_number).where(
+    BlockedTable.table_number.in_(bindparam('table_numbers', expanding=True))
+)
+
+COUNTS_BY_TABLE = select(
+    TableAssignment.table_number,
+    func.count(TableAssignment.id)
+).where(
+    TableAssignment.table_number.in_(bindparam('table_numbers', expanding=True))
+).group_by(TableAssignment.table_number)
+
+DELETE_ASSIGNMENT_BY_ID = delete(TableAssignment).where(
+    TableAssignment.id == bindparam('assignment_id')
+).returning(TableAssignment.table_number)
+
+DELETE_BLOCK_BY_TABLE = delete(BlockedTable).where(
+    BlockedTable.table_number == bindparam('table_number')
+).returning(BlockedTable.table_number)
+
+COUNT_ALL = select(func.count()).select_from(TableAssignment)
+
+COUNT_AT_TABLE = select(func.count()).select_from(TableAssignment).where(
+    TableAssignment.table_number == bindparam('table_number')
+)
+
 # ==================== HELPER FUNCTIONS ====================
 
-def get_table_status():
-    """Get status of all tables with occupancy info"""
-    tables = []
-    
+def build_table_status():
+    """Build status of all tables with occupancy info from the database"""
     # Single query for all blocked tables
-    blocked_dict = {bt.table_number: bt.reason for bt in BlockedTable.query.all()}
+    blocked_dict = dict(db.session.execute(BLOCKED_REASONS).all())
     
-    # Single query for all assignments, organized by table
-    all_assignments = TableAssignment.query.all()
-    assignments_by_table = {}
-    for assignment in all_assignments:
-        if assignment.table_number not in assignments_by_table:
-            assignments_by_table[assignment.table_number] = []
-        assignments_by_table[assignment.table_number].append(assignment)
+    # Single query for the rendered columns only, bucketed by table in Python
+    rows = db.session.execute(OCCUPANTS).all()
     
-    # Build table status
-    for table_num in range(1, TOTAL_TABLES + 1):
-        assignments = assignments_by_table.get(table_num, [])
-        occupied = len(assignments)
-        available = SEATS_PER_TABLE - occupied
-        is_blocked = table_num in blocked_dict
-        
-        occupants = [{
-            'ticket': a.ticket_number,
-            'name': a.full_name
-        } for a in assignments]
-        
-        tables.append({
-            'number': table_num,
-            'capacity': SEATS_PER_TABLE,
-            'occupied': occupied,
-            'available': available,
-            'is_full': occupied >= SEATS_PER_TABLE,
-            'is_blocked': is_blocked,
-            'block_reason': blocked_dict.get(table_num, ''),
-            'occupants': occupants
+    occupants_by_table = defaultdict(list)
+    for table_number, ticket_number, full_name in rows:
+        occupants_by_table[table_number].append({
+            'ticket': ticket_number,
+            'name': full_name
         })
     
+    # Copy the empty skeleton, then overlay only tables that have data;
+    # each copy gets its own occupants list rather than aliasing the skeleton's
+    capacity = SEATS_PER_TABLE
+    tables = [dict(blank, occupants=[]) for blank in TABLE_SKELETON]
+    for table_num, occupants in occupants_by_table.items():
+        if 1 <= table_num <= TOTAL_TABLES:
+            occupied = len(occupants)
+            table = tables[table_num - 1]
+            table['occupied'] = occupied
+            table['available'] = capacity - occupied
+            table['is_full'] = occupied >= capacity
+            table['occupants'] = occupants
+    for table_num, reason in blocked_dict.items():
+        if 1 <= table_num <= TOTAL_TABLES:
+            table = tables[table_num - 1]
+            table['is_blocked'] = True
+            table['block_reason'] = reason
+    
     return tables
 
+def load_table_status():
+    """Cached (tables, body, summary body, version), rebuilt on a miss.
+    The queries run outside _cache_lock so readers never queue behind a
+    round-trip; the result is only stored if no write landed meanwhile."""
+    global _table_status_cache
+    with _cache_lock:
+        if _table_status_cache is not None:
+            return _table_status_cache
+        version = _state_version
+    
+    tables = build_table_status()
+    # Encode the HTTP bodies once per snapshot rather than once per poll
+    body = orjson.dumps({'success': True, 'tables': tables, 'version': version})
+    summary = [{k: v for k, v in t.items() if k != 'occupants'} for t in tables]
+    summary_body = orjson.dumps({'success': True, 'tables': summary, 'version': version})
+    snapshot = (tables, body, summary_body, version)
+    
+    with _cache_lock:
+        if _state_version == version and _table_status_cache is None:
+            _table_status_cache = snapshot
+    return snapshot
+
+def get_table_status():
+    """Get status of all tables, served from cache until the next write"""
+    return load_table_status()[0]
+
+def get_table_status_body(summary=False):
+    """Pre-encoded JSON body and version for the get-tables endpoints; summary omits occupants"""
+    _, body, summary_body, version = load_table_status()
+    return (summary_body if summary else body), version
+
+def tables_response(summary=False):
+    """Cached get-tables body tagged with the state version, so unchanged polls get a 304"""
+    body, version = get_table_status_body(summary)
+    response = Response(body, mimetype='application/json')
+    response.set_etag(f'{version}-summary' if summary else str(version))
+    # Always revalidate - a 304 is cheap, a stale seat map is not
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+def invalidate_table_status():
+    """Drop the cached table status and assignments so the next read hits the database"""
+    global _table_status_cache, _assignment_cache, _guest_count, _state_version
+    with _cache_lock:
+        _table_status_cache = None
+        _assignment_cache = None
+        _guest_count = None
+        _state_version += 1
+
+def current_tables_payload():
+    """Fresh tables and version for write responses that let the client skip a re-fetch"""
+    tables, _, _, version = load_table_status()
+    return {'tables': tables, 'version': version}
+
+def initial_dashboard_state():
+    """Tables, version and assignments inlined into dashboard pages so they
+    render without startup fetches"""
+    return {**current_tables_payload(), 'assignments': get_all_assignment_dicts()}
+
+def broadcast_tables(table_numbers=None):
+    """Invalidate the cache and schedule one coalesced push to all clients.
+    Pass the changed table numbers to send only those; None sends every table."""
+    global _broadcast_pending, _broadcast_all
+    if table_numbers is not None:
+        # The delta filters on int table numbers, so "2" would never match
+        numbers = set()
+        for number in table_numbers:
+            try:
+                number = int(number)
+            except (TypeError, ValueError):
+                continue
+            if 1 <= number <= TOTAL_TABLES:
+                numbers.add(number)
+        table_numbers = numbers
+    with _broadcast_lock:
+        # Bump the version under the same lock the emitter drains with, so a
+        # captured version never runs ahead of the tables queued for it
+        invalidate_table_status()
+        if table_numbers is None:
+            _broadcast_all = True
+        else:
+            _broadcast_tables.update(table_numbers)
+        if _broadcast_pending:
+            return
+        _broadcast_pending = True
+    socketio.start_background_task(emit_table_update)
+
+def emit_table_update():
+    """Wait out the debounce window, then emit the changes once"""
+    global _broadcast_pending, _broadcast_all
+    socketio.sleep(BROADCAST_DEBOUNCE_SECONDS)
+    with _broadcast_lock:
+        send_all = _broadcast_all
+        changed = set(_broadcast_tables)
+        drained_version = _state_version
+        _broadcast_pending = False
+        _broadcast_all = False
+        _broadcast_tables.clear()
+    with app.app_context():
+        tables, _, _, version = load_table_status()
+        # A write after the drain is in this snapshot but not in `changed`,
+        # so a delta would claim a version it doesn't cover - send everything
+        if send_all or version != drained_version:
+            socketio.emit('table_update', {'tables': tables, 'version': version}, namespace='/')
+        else:
+            socketio.emit('table_delta', {
+                'tables': [t for t in tables if t['number'] in changed],
+                'version': version
+            }, namespace='/')
+
+def assignment_to_dict(row):
+    """Serialize an ASSIGNMENT_COLUMNS row, same shape as TableAssignment.to_dict()"""
+    return {
+        'id': row.id,
+        'ticket_number': row.ticket_number,
+        'full_name': row.full_name,
+        'table_number': row.table_number,
+        'assigned_at': row.assigned_at.isoformat()
+    }
+
+def load_assignments():
+    """Cached (assignment dicts, dicts by ticket, body), rebuilt on a miss
+    outside _cache_lock, same as load_table_status()"""
+    global _assignment_cache
+    with _cache_lock:
+        if _assignment_cache is not None:
+            return _assignment_cache
+        version = _state_version
+    
+    assignments = [assignment_to_dict(row) for row in db.session.execute(ALL_ASSIGNMENTS)]
+    by_ticket = {a['ticket_number']: a for a in assignments}
+    # Encode the listing body once per snapshot, like the get-tables bodies
+    body = orjson.dumps({'success': True, 'assignments': assignments})
+    snapshot = (assignments, by_ticket, body)
+    
+    with _cache_lock:
+        if _state_version == version and _assignment_cache is None:
+            _assignment_cache = snapshot
+    return snapshot
+
+def get_all_assignment_dicts():
+    """All assignments ordered by table and assignment time"""
+    return load_assignments()[0]
+
+def get_all_assignments_body():
+    """Pre-encoded JSON body for the assignment listing endpoints"""
+    return load_assignments()[2]
+
+def find_assignment(ticket_number):
+    """Assignment dict for a ticket number, or None"""
+    return load_assignments()[1].get(ticket_number)
+
+def count_assignments(table_number=None):
+    """COUNT(*) of all assignments, or of one table's assignments"""
+    if table_number is None:
+        return db.session.scalar(COUNT_ALL)
+    return db.session.scalar(COUNT_AT_TABLE, {'table_number': table_number})
+
+def get_guest_count():
+    """Total assignments, cached until the next write. Seat-writing routes
+    re-count with count_assignments() under the seating lock."""
+    global _guest_count
+    with _cache_lock:
+        if _guest_count is not None:
+            return _guest_count
+        version = _state_version
+    
+    total = count_assignments()
+    with _cache_lock:
+        if _state_version == version and _guest_count is None:
+            _guest_count = total
+    return total
+
+def is_ticket_number(value):
+    """ASCII digits only - str.isdigit() alone also accepts other scripts' digits"""
+    return value.isascii() and value.isdigit()
+
+def is_table_number(value):
+    """A real table number - an int (not a bool) in 1..TOTAL_TABLES"""
+    return isinstance(value, int) and not isinstance(value, bool) and 1 <= value <= TOTAL_TABLES
+
 def validate_tickets(ticket_data):
     """Validate ticket numbers - accepts ANY ticket number, tracks up to 250 total guests"""
     validated_guests = []
     ticket_numbers_in_request = []
+    seen_tickets = set()
     
     for data in ticket_data:
         ticket_number = data.get('ticket_number', '').strip()
@@ -105,27 +469,31 @@ def validate_tickets(ticket_data):
             return False, [], "All fields must be filled out"
         
         # Validate ticket number is numeric only
-        if not ticket_number.isdigit():
+        if not is_ticket_number(ticket_number):
             return False, [], f"Ticket {ticket_number} is invalid. Ticket numbers must be numbers only (no letters or special characters)."
         
-        # Check for duplicates in current request
-        if ticket_number in ticket_numbers_in_request:
+        # Check for duplicates in current request - set lookup, list keeps entry order
+        if ticket_number in seen_tickets:
             return False, [], f"Ticket {ticket_number} appears multiple times in your entry. Please remove duplicates."
         
+        seen_tickets.add(ticket_number)
         ticket_numbers_in_request.append(ticket_number)
         
-        # Check if ticket is already assigned
-        existing_assignment = TableAssignment.query.filter_by(ticket_number=ticket_number).first()
-        if existing_assignment:
-            return False, [], f"Ticket {ticket_number} has already been assigned to Table {existing_assignment.table_number}"
-        
         validated_guests.append({
             'ticket_number': ticket_number,
             'full_name': full_name
         })
     
+    # Check if any ticket is already assigned - one IN query for the whole party
+    assigned_tables = dict(db.session.execute(
+        ASSIGNED_TABLES_BY_TICKETS, {'ticket_numbers': ticket_numbers_in_request}
+    ).all())
+    for ticket_number in ticket_numbers_in_request:
+        if ticket_number in assigned_tables:
+            return False, [], f"Ticket {ticket_number} has already been assigned to Table {assigned_tables[ticket_number]}"
+    
     # Check total capacity (250 guests max)
-    current_total = TableAssignment.query.count()
+    current_total = get_guest_count()
     new_total = current_total + len(validated_guests)
     
     if new_total > MAX_GUESTS:
@@ -139,7 +507,10 @@ def validate_tickets(ticket_data):
 @app.route('/')
 def index():
     """Landing page - ticket entry"""
-    session.clear()
+    # Drop only the guest flow's keys - admin login survives, and popping an
+    # absent key leaves the session unmodified so no cookie is rewritten
+    session.pop('guests', None)
+    session.pop('final_tickets', None)
     return render_template('index.html')
 
 @app.route('/api/validate-tickets', methods=['POST'])
@@ -181,14 +552,26 @@ def select_seats():
 
 @app.route('/api/get-tables')
 def get_tables_api():
-    """Get all tables status"""
+    """Get all tables status - ?summary=1 leaves out occupant lists"""
     try:
-        tables = get_table_status()
-        return jsonify({'success': True, 'tables': tables})
+        summary = request.args.get('summary') == '1'
+        return tables_response(summary)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/get-table/<int:table_number>')
+def get_table_api(table_number):
+    """Get one table's status including its occupants"""
+    try:
+        if table_number < 1 or table_number > TOTAL_TABLES:
+            return jsonify({'success': False, 'error': 'Invalid table number'}), 404
+        
+        return jsonify({'success': True, 'table': get_table_status()[table_number - 1]})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/assign-seats', methods=['POST'])
+@serialize_seating
 def assign_seats_api():
     """Assign seats to guests"""
     try:
@@ -202,8 +585,22 @@ def assign_seats_api():
         if not guests:
             return jsonify({'success': False, 'error': 'Session expired. Please start over.'}), 400
         
+        # Only tickets validated into this session may be seated - dict lookup per row
+        validated_guests = {g['ticket_number']: g for g in guests}
+        for assignment in assignments:
+            if assignment.get('ticket_number') not in validated_guests:
+                return jsonify({
+                    'success': False,
+                    'error': f"Ticket {assignment.get('ticket_number')} was not validated. Please start over."
+                }), 400
+        
+        # Table numbers key the batched checks below, so "2" must not slip past as a string
+        for assignment in assignments:
+            if not is_table_number(assignment.get('table_number')):
+                return jsonify({'success': False, 'error': 'Invalid table number'}), 400
+        
         # Check total capacity
-        current_total = TableAssignment.query.count()
+        current_total = count_assignments()
         new_total = current_total + len(assignments)
         
         if new_total > MAX_GUESTS:
@@ -213,53 +610,77 @@ def assign_seats_api():
                 'error': f'Only {remaining} spots remaining. The gala is limited to {MAX_GUESTS} guests.'
             }), 400
         
+        # Check if already assigned - one IN query, repeats in the request count too
+        ticket_numbers = [a.get('ticket_number') for a in assignments]
+        already_assigned = set(db.session.scalars(
+            ASSIGNED_TICKETS_BY_TICKETS, {'ticket_numbers': ticket_numbers}
+        ))
+        for ticket_number in ticket_numbers:
+            if ticket_number in already_assigned:
+                return jsonify({
+                    'success': False,
+                    'error': f'Ticket {ticket_number} is already assigned'
+                }), 400
+            already_assigned.add(ticket_number)
+        
+        # Load blocked flags and occupancy for every requested table in two queries
+        table_numbers = {a.get('table_number') for a in assignments}
+        blocked_tables = set(db.session.scalars(
+            BLOCKED_IN_TABLES, {'table_numbers': list(table_numbers)}
+        ))
+        table_counts = dict(db.session.execute(
+            COUNTS_BY_TABLE, {'table_numbers': list(table_numbers)}
+        ).all())
+        
         # Validate and create assignments
         created_assignments = []
         
         for assignment in assignments:
             ticket_number = assignment.get('ticket_number')
-            full_name = assignment.get('full_name')
+            # The name comes from validation, not from whatever the client resends
+            full_name = validated_guests[ticket_number]['full_name']
             table_number = assignment.get('table_number')
             
-            # Check if already assigned
-            existing = TableAssignment.query.filter_by(ticket_number=ticket_number).first()
-            if existing:
+            # Blocked tables can only be filled by an admin
+            if table_number in blocked_tables:
                 return jsonify({
                     'success': False,
-                    'error': f'Ticket {ticket_number} is already assigned'
+                    'error': f'Table {table_number} is reserved'
                 }), 400
             
-            # Check table capacity
-            table_count = TableAssignment.query.filter_by(table_number=table_number).count()
+            # Check table capacity, counting seats taken earlier in this request
+            table_count = table_counts.get(table_number, 0)
             if table_count >= SEATS_PER_TABLE:
                 return jsonify({
                     'success': False,
                     'error': f'Table {table_number} is full'
                 }), 400
+            table_counts[table_number] = table_count + 1
             
-            # Create assignment
-            new_assignment = TableAssignment(
-                ticket_number=ticket_number,
-                full_name=full_name,
-                table_number=table_number
-            )
-            db.session.add(new_assignment)
             created_assignments.append({
                 'ticket_number': ticket_number,
                 'full_name': full_name,
                 'table_number': table_number
             })
         
+        # Create all assignments in a single executemany INSERT
+        db.session.execute(insert(TableAssignment), created_assignments)
         db.session.commit()
         
-        # Store in session for confirmation page
-        session['final_assignments'] = created_assignments
+        # Keep only ticket numbers in the cookie; the confirmation page reloads the rows
+        session.pop('guests', None)
+        session['final_tickets'] = ticket_numbers
         
         # Broadcast update via WebSocket
-        socketio.emit('table_update', {'tables': get_table_status()}, namespace='/')
+        broadcast_tables(table_numbers)
         
         return jsonify({'success': True})
         
+    except IntegrityError:
+        # The unique ticket_number index rejected a duplicate the precheck missed
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'One of these tickets is already assigned'}), 400
+        
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -267,11 +688,16 @@ def assign_seats_api():
 @app.route('/confirmation')
 def confirmation():
     """Confirmation page"""
-    assignments = session.get('final_assignments', [])
+    ticket_numbers = session.get('final_tickets', [])
     
-    if not assignments:
+    if not ticket_numbers:
         return redirect(url_for('index'))
     
+    # One IN query, shown in the order the guests were entered
+    rows = db.session.execute(ASSIGNMENTS_BY_TICKETS, {'ticket_numbers': ticket_numbers}).all()
+    by_ticket = {row.ticket_number: row for row in rows}
+    assignments = [by_ticket[t] for t in ticket_numbers if t in by_ticket]
+    
     return render_template('confirmation.html', assignments=assignments)
 
 # ==================== USHER ROUTES ====================
@@ -279,14 +705,13 @@ def confirmation():
 @app.route('/usher')
 def usher():
     """Usher dashboard - real-time view"""
-    return render_template('usher.html', total_tables=TOTAL_TABLES)
+    return render_template('usher.html', total_tables=TOTAL_TABLES, initial_state=initial_dashboard_state())
 
 @app.route('/api/usher/get-tables')
 def usher_get_tables():
     """Get table status for ushers"""
     try:
-        tables = get_table_status()
-        return jsonify({'success': True, 'tables': tables})
+        return tables_response()
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -294,20 +719,7 @@ def usher_get_tables():
 def usher_get_all_assignments():
     """Get all assignments for ushers"""
     try:
-        assignments = TableAssignment.query.order_by(
-            TableAssignment.table_number, 
-            TableAssignment.assigned_at
-        ).all()
-        
-        assignments_data = [{
-            'id': a.id,
-            'ticket_number': a.ticket_number,
-            'full_name': a.full_name,
-            'table_number': a.table_number,
-            'assigned_at': a.assigned_at.isoformat()
-        } for a in assignments]
-        
-        return jsonify({'success': True, 'assignments': assignments_data})
+        return Response(get_all_assignments_body(), mimetype='application/json')
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -321,20 +733,14 @@ def usher_lookup_ticket():
             return jsonify({'success': False, 'error': 'No ticket number provided'}), 400
         
         # Check if assigned
-        assignment = TableAssignment.query.filter_by(ticket_number=ticket_number).first()
+        assignment = find_assignment(ticket_number)
         
         if assignment:
             return jsonify({
                 'success': True,
                 'ticket_exists': True,
                 'found': True,
-                'assignment': {
-                    'id': assignment.id,
-                    'ticket_number': assignment.ticket_number,
-                    'full_name': assignment.full_name,
-                    'table_number': assignment.table_number,
-                    'assigned_at': assignment.assigned_at.isoformat()
-                }
+                'assignment': assignment
             })
         else:
             return jsonify({
@@ -355,9 +761,10 @@ def admin_login():
     if request.method == 'GET':
         return render_template('admin_login.html')
     
-    password = request.form.get('password')
+    password = request.form.get('password', '')
     
-    if password == app.config['ADMIN_PASSWORD']:
+    # Constant-time compare so response timing doesn't leak the password prefix
+    if hmac.compare_digest(password.encode(), app.config['ADMIN_PASSWORD'].encode()):
         session['is_admin'] = True
         session.permanent = True
         return redirect(url_for('admin_panel'))
@@ -374,18 +781,15 @@ def admin_logout():
 @require_admin
 def admin_panel():
     """Admin control panel"""
-    return render_template('admin.html', total_tables=TOTAL_TABLES, max_guests=MAX_GUESTS)
+    return render_template('admin.html', total_tables=TOTAL_TABLES, max_guests=MAX_GUESTS,
+                           initial_state=initial_dashboard_state())
 
 @app.route('/api/admin/get-all-assignments')
 @require_admin
 def get_all_assignments():
     """Get all seat assignments"""
     try:
-        assignments = TableAssignment.query.order_by(TableAssignment.table_number, TableAssignment.assigned_at).all()
-        return jsonify({
-            'success': True,
-            'assignments': [a.to_dict() for a in assignments]
-        })
+        return Response(get_all_assignments_body(), mimetype='application/json')
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -396,16 +800,17 @@ def delete_any_assignment():
     try:
         assignment_id = request.json.get('assignment_id')
         
-        assignment = TableAssignment.query.get(assignment_id)
-        if not assignment:
+        # One DELETE ... RETURNING instead of SELECT then DELETE
+        table_number = db.session.scalar(DELETE_ASSIGNMENT_BY_ID, {'assignment_id': assignment_id})
+        if table_number is None:
             return jsonify({'success': False, 'error': 'Assignment not found'}), 404
         
-        db.session.delete(assignment)
         db.session.commit()
         
-        socketio.emit('table_update', {'tables': get_table_status()}, namespace='/')
+        broadcast_tables([table_number])
         
-        return jsonify({'success': True})
+        # Fresh tables in the response so the admin page needn't re-fetch
+        return jsonify({'success': True, **current_tables_payload()})
         
     except Exception as e:
         db.session.rollback()
@@ -422,17 +827,17 @@ def block_table_api():
         if table_number < 1 or table_number > TOTAL_TABLES:
             return jsonify({'success': False, 'error': 'Invalid table number'}), 400
         
-        existing = BlockedTable.query.filter_by(table_number=table_number).first()
-        if existing:
+        if db.session.scalar(TABLE_IS_BLOCKED, {'table_number': table_number}):
             return jsonify({'success': False, 'error': 'Table already blocked'}), 400
         
         blocked = BlockedTable(table_number=table_number, reason=reason)
         db.session.add(blocked)
         db.session.commit()
         
-        socketio.emit('table_update', {'tables': get_table_status()}, namespace='/')
+        broadcast_tables([table_number])
         
-        return jsonify({'success': True})
+        # Fresh tables in the response so the admin page needn't re-fetch
+        return jsonify({'success': True, **current_tables_payload()})
         
     except Exception as e:
         db.session.rollback()
@@ -445,16 +850,16 @@ def unblock_table_api():
     try:
         table_number = request.json.get('table_number')
         
-        blocked = BlockedTable.query.filter_by(table_number=table_number).first()
-        if not blocked:
+        unblocked = db.session.scalar(DELETE_BLOCK_BY_TABLE, {'table_number': table_number})
+        if unblocked is None:
             return jsonify({'success': False, 'error': 'Table not blocked'}), 404
         
-        db.session.delete(blocked)
         db.session.commit()
         
-        socketio.emit('table_update', {'tables': get_table_status()}, namespace='/')
+        broadcast_tables([table_number])
         
-        return jsonify({'success': True})
+        # Fresh tables in the response so the admin page needn't re-fetch
+        return jsonify({'success': True, **current_tables_payload()})
         
     except Exception as e:
         db.session.rollback()
@@ -470,12 +875,12 @@ def lookup_ticket():
         if not ticket_number:
             return jsonify({'success': False, 'error': 'Ticket number required'}), 400
         
-        assignment = TableAssignment.query.filter_by(ticket_number=ticket_number).first()
+        assignment = find_assignment(ticket_number)
         
         if assignment:
             return jsonify({
                 'success': True,
-                'assignment': assignment.to_dict(),
+                'assignment': assignment,
                 'ticket_exists': True
             })
         else:
@@ -490,6 +895,7 @@ def lookup_ticket():
 
 @app.route('/api/admin/manual-assign', methods=['POST'])
 @require_admin
+@serialize_seating
 def manual_assign_api():
     """Manually assign a guest to a table (even if blocked) - ADMIN ONLY"""
     try:
@@ -501,22 +907,22 @@ def manual_assign_api():
             return jsonify({'success': False, 'error': 'Missing required fields'}), 400
         
         # Validate ticket number is numeric
-        if not ticket_number.isdigit():
+        if not is_ticket_number(ticket_number):
             return jsonify({'success': False, 'error': 'Ticket number must be numbers only'}), 400
         
         if table_number < 1 or table_number > TOTAL_TABLES:
             return jsonify({'success': False, 'error': 'Invalid table number'}), 400
         
         # Check if ticket is already assigned
-        existing = TableAssignment.query.filter_by(ticket_number=ticket_number).first()
-        if existing:
+        existing_table = db.session.scalar(ASSIGNED_TABLE_BY_TICKET, {'ticket_number': ticket_number})
+        if existing_table is not None:
             return jsonify({
                 'success': False, 
-                'error': f'Ticket {ticket_number} is already assigned to Table {existing.table_number}'
+                'error': f'Ticket {ticket_number} is already assigned to Table {existing_table}'
             }), 400
         
         # Check table capacity (even for blocked tables)
-        current_count = TableAssignment.query.filter_by(table_number=table_number).count()
+        current_count = count_assignments(table_number)
         if current_count >= SEATS_PER_TABLE:
             return jsonify({
                 'success': False,
@@ -524,7 +930,7 @@ def manual_assign_api():
             }), 400
         
         # Check total capacity
-        total_guests = TableAssignment.query.count()
+        total_guests = count_assignments()
         if total_guests >= MAX_GUESTS:
             return jsonify({
                 'success': False,
@@ -541,19 +947,26 @@ def manual_assign_api():
         db.session.commit()
         
         # Broadcast update
-        socketio.emit('table_update', {'tables': get_table_status()}, namespace='/')
+        broadcast_tables([table_number])
         
         return jsonify({
             'success': True,
-            'message': f'Successfully assigned to Table {table_number}'
+            'message': f'Successfully assigned to Table {table_number}',
+            **current_tables_payload()
         })
         
+    except IntegrityError:
+        # The unique ticket_number index rejected a duplicate the precheck missed
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'This ticket is already assigned'}), 400
+        
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/admin/edit-assignment', methods=['POST'])
 @require_admin
+@serialize_seating
 def edit_assignment_api():
     """Edit an existing assignment - change ticket number, name, or table"""
     try:
@@ -566,7 +979,7 @@ def edit_assignment_api():
             return jsonify({'success': False, 'error': 'Assignment ID required'}), 400
         
         # Get existing assignment
-        assignment = TableAssignment.query.get(assignment_id)
+        assignment = db.session.get(TableAssignment, assignment_id)
         if not assignment:
             return jsonify({'success': False, 'error': 'Assignment not found'}), 404
         
@@ -576,14 +989,14 @@ def edit_assignment_api():
         # If changing ticket number, check if new ticket is available
         if new_ticket_number and new_ticket_number != old_ticket_number:
             # Validate ticket number is numeric
-            if not new_ticket_number.isdigit():
+            if not is_ticket_number(new_ticket_number):
                 return jsonify({'success': False, 'error': 'Ticket number must be numbers only'}), 400
             
-            existing = TableAssignment.query.filter_by(ticket_number=new_ticket_number).first()
-            if existing:
+            existing_table = db.session.scalar(ASSIGNED_TABLE_BY_TICKET, {'ticket_number': new_ticket_number})
+            if existing_table is not None:
                 return jsonify({
                     'success': False,
-                    'error': f'Ticket {new_ticket_number} is already assigned to Table {existing.table_number}'
+                    'error': f'Ticket {new_ticket_number} is already assigned to Table {existing_table}'
                 }), 400
             
             assignment.ticket_number = new_ticket_number
@@ -595,7 +1008,7 @@ def edit_assignment_api():
         # If changing table, check capacity
         if new_table_number and new_table_number != old_table_number:
             # Check new table capacity
-            new_table_count = TableAssignment.query.filter_by(table_number=new_table_number).count()
+            new_table_count = count_assignments(new_table_number)
             if new_table_count >= SEATS_PER_TABLE:
                 return jsonify({
                     'success': False,
@@ -607,13 +1020,19 @@ def edit_assignment_api():
         db.session.commit()
         
         # Broadcast update
-        socketio.emit('table_update', {'tables': get_table_status()}, namespace='/')
+        broadcast_tables([old_table_number, new_table_number or old_table_number])
         
         return jsonify({
             'success': True,
-            'message': 'Assignment updated successfully'
+            'message': 'Assignment updated successfully',
+            **current_tables_payload()
         })
         
+    except IntegrityError:
+        # The unique ticket_number index rejected a duplicate the precheck missed
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'This ticket is already assigned'}), 400
+        
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -623,20 +1042,19 @@ def edit_assignment_api():
 def reset_demo():
     """Reset all assignments"""
     try:
-        # Delete all assignments
-        TableAssignment.query.delete()
-        
-        # Unblock all tables
-        BlockedTable.query.delete()
+        # Two bulk DELETEs in one transaction, skipping identity-map sync
+        db.session.execute(delete(TableAssignment).execution_options(synchronize_session=False))
+        db.session.execute(delete(BlockedTable).execution_options(synchronize_session=False))
         
         db.session.commit()
         
         # Broadcast update
-        socketio.emit('table_update', {'tables': get_table_status()}, namespace='/')
+        broadcast_tables()
         
         return jsonify({
             'success': True,
-            'message': f'All assignments and blocks reset. System ready to accept any ticket numbers (up to {MAX_GUESTS} total guests).'
+            'message': f'All assignments and blocks reset. System ready to accept any ticket numbers (up to {MAX_GUESTS} total guests).',
+            **current_tables_payload()
         })
         
     except Exception as e:
@@ -652,10 +1070,14 @@ def reset_tickets():
 # ==================== WEBSOCKET EVENTS ====================
 
 @socketio.on('connect')
-def handle_connect():
-    """Handle client connection"""
+def handle_connect(auth=None):
+    """Handle client connection - skip the snapshot if the client already has it"""
     print('Client connected')
-    emit('table_update', {'tables': get_table_status()})
+    tables, _, _, version = load_table_status()
+    # auth is whatever the client sent - only a dict can carry a version
+    if isinstance(auth, dict) and auth.get('version') == version:
+        return
+    emit('table_update', {'tables': tables, 'version': version})
 
 @socketio.on('disconnect')
 def handle_disconnect():
@@ -1,6 +1,19 @@
 # gunicorn_config.py
-bind = "0.0.0.0:10000"
+import os
+
+# Heroku/Railway assign PORT; Render defaults to 10000
+bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
+# One gevent worker: SocketIO broadcasts and the in-process caches live in this process
 workers = 1
-worker_class = "gevent"
+# The gevent worker monkey-patches the stdlib before loading app.py, so leave preload_app off
+worker_class = "geventwebsocket.gunicorn.workers.GeventWebSocketWorker"
+worker_connections = 1000
 timeout = 120
 keepalive = 5
+
+def post_fork(server, worker):
+    """Make psycopg2 yield to the gevent hub while it waits on PostgreSQL -
+    monkey.patch_all() only covers pure-Python sockets, so without this every
+    query stalls all SocketIO connections in the worker"""
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
@@ -7,11 +7,17 @@ class TableAssignment(db.Model):
     __tablename__ = 'table_assignments'
     
     id = db.Column(db.Integer, primary_key=True)
+    # Unique index: backs every ticket lookup and rejects a second assignment per ticket
     ticket_number = db.Column(db.String(50), unique=True, nullable=False, index=True)
     full_name = db.Column(db.String(200), nullable=False)
     table_number = db.Column(db.Integer, nullable=False)
     assigned_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Per-table counts and the table/arrival ordering are served from this index
+    __table_args__ = (
+        db.Index('idx_table_lookup', 'table_number', 'assigned_at'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -5,15 +5,27 @@ Run this after starting the application to test basic functionality
 
 import requests
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 BASE_URL = "http://localhost:5000"
 
-def test_home_page():
+# One keep-alive session per thread - requests.Session isn't thread-safe,
+# and the concurrent probes shouldn't share a cookie jar
+_local = threading.local()
+
+def http():
+    """The calling thread's keep-alive session"""
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+def test_home_page(log=print):
     """Test that home page loads"""
-    print("Testing home page...")
-    response = requests.get(f"{BASE_URL}/")
+    log("Testing home page...")
+    response = http().get(f"{BASE_URL}/")
     assert response.status_code == 200
-    print("✓ Home page loads successfully")
+    log("✓ Home page loads successfully")
 
 def test_ticket_validation():
     """Test ticket validation"""
@@ -27,10 +39,9 @@ def test_ticket_validation():
         ]
     }
     
-    response = requests.post(
+    response = http().post(
         f"{BASE_URL}/api/validate-tickets",
-        json=valid_data,
-        headers={"Content-Type": "application/json"}
+        json=valid_data
     )
     
     assert response.status_code == 200
@@ -45,19 +56,38 @@ def test_ticket_validation():
         ]
     }
     
-    response = requests.post(
+    response = http().post(
         f"{BASE_URL}/api/validate-tickets",
-        json=invalid_data,
-        headers={"Content-Type": "application/json"}
+        json=invalid_data
     )
     
     assert response.status_code == 400
     print("✓ Invalid tickets rejected")
 
-def test_get_tables():
+def test_assign_rejects_bad_table():
+    """Test that seat assignment rejects non-integer and out-of-range tables"""
+    print("\nTesting seat assignment table validation...")
+    
+    response = http().post(
+        f"{BASE_URL}/api/validate-tickets",
+        json={"tickets": [{"full_name": "Table Check", "ticket_number": "90001"}]}
+    )
+    assert response.status_code == 200
+    
+    for table_number in ["2", 0, 99, True]:
+        response = http().post(
+            f"{BASE_URL}/api/assign-seats",
+            json={"assignments": [
+                {"full_name": "Table Check", "ticket_number": "90001", "table_number": table_number}
+            ]}
+        )
+        assert response.status_code == 400, f"table_number {table_number!r} was accepted"
+    print("✓ Invalid table numbers rejected")
+
+def test_get_tables(log=print):
     """Test getting table status"""
-    print("\nTesting table status retrieval...")
-    response = requests.get(f"{BASE_URL}/api/get-tables")
+    log("\nTesting table status retrieval...")
+    response = http().get(f"{BASE_URL}/api/get-tables")
     
     assert response.status_code == 200
     data = response.json()
@@ -71,13 +101,13 @@ def test_get_tables():
     assert "occupied" in table
     assert "occupants" in table
     
-    print(f"✓ Retrieved {len(data['tables'])} tables")
-    print(f"  Table 1: {table['occupied']}/{table['capacity']} seats occupied")
+    log(f"✓ Retrieved {len(data['tables'])} tables")
+    log(f"  Table 1: {table['occupied']}/{table['capacity']} seats occupied")
 
 def test_reset_demo():
     """Test demo reset functionality"""
     print("\nTesting demo reset...")
-    response = requests.get(f"{BASE_URL}/admin/reset-demo")
+    response = http().get(f"{BASE_URL}/admin/reset-demo")
     
     assert response.status_code == 200
     data = response.json()
@@ -91,8 +121,25 @@ def run_all_tests():
     print("=" * 50)
     
     try:
-        test_home_page()
-        test_get_tables()
+        # Read-only probes don't depend on each other, so overlap their round-trips.
+        # Each collects its lines and they print in order, so output never interleaves.
+        probe_logs = [[], []]
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            probes = [
+                executor.submit(test, lines.append)
+                for test, lines in zip((test_home_page, test_get_tables), probe_logs)
+            ]
+            for probe, lines in zip(probes, probe_logs):
+                try:
+                    probe.result()
+                finally:
+                    for line in lines:
+                        print(line)
+        
+        # Reset wipes every assignment and validation writes the session cookie,
+        # so neither can overlap the probes above - they run in order.
+        # The table check needs no admin login, so it runs before reset.
+        test_assign_rejects_bad_table()
         test_reset_demo()
         test_ticket_validation()
         